@@ -1,5 +1,23 @@
+// Steps are rendered in blocks of this size so huge chapters stay cheap to scroll.
+const STEP_BLOCK_SIZE = 50;
+// How far outside the viewport chapters and step blocks are kept rendered.
+const RENDER_MARGIN = '1500px';
+// Rough heights used for placeholders before a block has been measured.
+const ESTIMATED_STEP_HEIGHT = 40;
+const ESTIMATED_HEADER_HEIGHT = 220;
+// localStorage key for the completed-steps bitmap.
+const PROGRESS_KEY = 'hcim-guide-progress';
+// Longest a pending progress save may wait for an idle period.
+const SAVE_TIMEOUT_MS = 1000;
+
+// Falls back to a short timeout on browsers without requestIdleCallback (e.g. Safari).
+const scheduleIdle = window.requestIdleCallback
+    ? (callback, options) => window.requestIdleCallback(callback, options)
+    : callback => setTimeout(() => callback({ timeRemaining: () => 8 }), 1);
+
 document.addEventListener('DOMContentLoaded', () => {
     const guideContainer = document.getElementById('guide-container');
+    document.getElementById('export-progress').addEventListener('click', exportProgress);
 
     // Fetch the generated guide using an absolute path from the server root.
     // This is more reliable than a relative path.
@@ -12,7 +30,11 @@ document.addEventListener('DOMContentLoaded', () => {
         })
         .then(guideData => {
             guideContainer.innerHTML = ''; // Clear loading message
-            renderGuide(guideData, guideContainer);
+            // Older guides are a bare list of trips without a step id version.
+            const trips = Array.isArray(guideData) ? guideData : guideData.trips;
+            const stepIdVersion = Array.isArray(guideData) ? null : guideData.step_id_version;
+            loadProgress(stepIdVersion, guideContainer);
+            renderGuide(trips, guideContainer);
         })
         .catch(error => {
             console.error('Error fetching the guide:', error);
@@ -20,28 +42,225 @@ document.addEventListener('DOMContentLoaded', () => {
         });
 });
 
+// --- Progress bitmap ---
+// Bit N is set when the step with id N (assigned by generate_guide.py) is done.
+// The bitmap is stored together with the guide's step id version, so progress
+// saved against a different id registry is detected instead of ticking the
+// wrong steps.
+
+const progress = { version: null, bits: new Uint8Array(0), saveScheduled: false };
+
+function loadProgress(version, container) {
+    progress.version = version;
+    try {
+        const stored = localStorage.getItem(PROGRESS_KEY);
+        if (!stored) return;
+        const saved = JSON.parse(stored);
+        if (!saved || saved.version !== version) {
+            console.warn(`Saved progress is for step id version ${saved && saved.version}, not ${version}. Ignoring it.`);
+            showNotice(container, 'Your saved checklist progress was made for a differently numbered guide and could not be restored.');
+            return;
+        }
+        progress.bits = Uint8Array.from(atob(saved.bits), char => char.charCodeAt(0));
+    } catch (error) {
+        console.error('Could not read saved progress:', error);
+    }
+}
+
+function showNotice(container, message) {
+    const notice = document.createElement('p');
+    notice.className = 'error';
+    notice.textContent = message;
+    container.prepend(notice);
+}
+
+function saveProgress() {
+    if (!progress.saveScheduled || progress.version === null) return;
+    progress.saveScheduled = false;
+    let binary = '';
+    progress.bits.forEach(byte => { binary += String.fromCharCode(byte); });
+    try {
+        localStorage.setItem(PROGRESS_KEY, JSON.stringify({ version: progress.version, bits: btoa(binary) }));
+    } catch (error) {
+        console.error('Could not save progress:', error);
+    }
+}
+
+// Downloads the ticked steps as player_state.json for generate_guide.py to resume from.
+function exportProgress() {
+    const completedSteps = [];
+    progress.bits.forEach((byte, index) => {
+        for (let bit = 0; bit < 8; bit++) {
+            if (byte & (1 << bit)) completedSteps.push(index * 8 + bit);
+        }
+    });
+    const state = { step_id_version: progress.version, completed_steps: completedSteps };
+    const link = document.createElement('a');
+    link.href = URL.createObjectURL(new Blob([JSON.stringify(state, null, 4)], { type: 'application/json' }));
+    link.download = 'player_state.json';
+    link.click();
+    setTimeout(() => URL.revokeObjectURL(link.href), 0);
+}
+
+// Idle callbacks may never run in a background tab, so flush when the page is hidden or closed.
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') saveProgress();
+});
+window.addEventListener('pagehide', saveProgress);
+
+function isStepDone(stepId) {
+    const byte = stepId >> 3;
+    return byte < progress.bits.length && (progress.bits[byte] & (1 << (stepId & 7))) !== 0;
+}
+
+function setStepDone(stepId, done) {
+    const byte = stepId >> 3;
+    if (byte >= progress.bits.length) {
+        const grown = new Uint8Array(byte + 1);
+        grown.set(progress.bits);
+        progress.bits = grown;
+    }
+    if (done) {
+        progress.bits[byte] |= 1 << (stepId & 7);
+    } else {
+        progress.bits[byte] &= ~(1 << (stepId & 7));
+    }
+    if (!progress.saveScheduled) {
+        progress.saveScheduled = true;
+        scheduleIdle(saveProgress, { timeout: SAVE_TIMEOUT_MS });
+    }
+}
+
+// --- Virtualized rendering ---
+// Chapters and step blocks start as empty placeholders of an estimated height.
+// They are filled in idle-time batches when they come near the viewport and
+// emptied again (keeping their measured height) once they scroll far away.
+
+const lazyBlocks = new WeakMap();
+const renderQueue = [];
+let renderScheduled = false;
+let blockObserver = null;
+
 function renderGuide(guide, container) {
     if (guide.length === 0) {
         container.innerHTML = `<p class="loading">Guide generated, but it's empty. Time to build the core logic!</p>`;
         return;
     }
 
+    blockObserver = new IntersectionObserver(onBlocksIntersect, { rootMargin: `${RENDER_MARGIN} 0px` });
+    container.addEventListener('change', onStepToggled);
+
     guide.forEach((trip, index) => {
         const tripElement = document.createElement('div');
         tripElement.className = 'trip';
+        const estimatedHeight = ESTIMATED_HEADER_HEIGHT + trip.steps.length * ESTIMATED_STEP_HEIGHT;
+        container.appendChild(createLazyBlock(tripElement, estimatedHeight, () => renderTrip(trip, index, tripElement)));
+    });
+}
+
+function createLazyBlock(element, estimatedHeight, render) {
+    element.classList.add('lazy-block');
+    element.style.height = `${estimatedHeight}px`;
+    lazyBlocks.set(element, { render, rendered: false, queued: false });
+    blockObserver.observe(element);
+    return element;
+}
 
-        tripElement.innerHTML = `
-            <h2>Chapter ${index + 1}: ${trip.title}</h2>
-            <p><strong>Goal:</strong> ${trip.goal}</p>
-            <h3>Inventory Setup:</h3>
-            <ul>
-                ${trip.inventory_setup.map(item => `<li>${item}</li>`).join('')}
-            </ul>
-            <h3>Steps:</h3>
-            <ol>
-                ${trip.steps.map(step => `<li><input type="checkbox"> ${step.text}</li>`).join('')}
-            </ol>
-        `;
-        container.appendChild(tripElement);
+function onBlocksIntersect(entries) {
+    entries.forEach(entry => {
+        const block = lazyBlocks.get(entry.target);
+        if (entry.isIntersecting) {
+            if (!block.rendered && !block.queued) {
+                block.queued = true;
+                renderQueue.push(entry.target);
+            }
+        } else if (block.rendered) {
+            // Keep the measured height so the scroll position doesn't jump.
+            entry.target.style.height = `${entry.target.offsetHeight}px`;
+            entry.target.querySelectorAll('.lazy-block').forEach(child => {
+                blockObserver.unobserve(child);
+                lazyBlocks.get(child).queued = false;
+            });
+            entry.target.replaceChildren();
+            block.rendered = false;
+        } else if (block.queued) {
+            block.queued = false;
+        }
     });
-}
\ No newline at end of file
+    scheduleRender();
+}
+
+function scheduleRender() {
+    if (!renderScheduled && renderQueue.length > 0) {
+        renderScheduled = true;
+        scheduleIdle(processRenderQueue);
+    }
+}
+
+function processRenderQueue(deadline) {
+    renderScheduled = false;
+    while (renderQueue.length > 0 && deadline.timeRemaining() > 1) {
+        const element = renderQueue.shift();
+        const block = lazyBlocks.get(element);
+        if (!block.queued) continue; // Scrolled away before its turn came
+        block.queued = false;
+        block.rendered = true;
+        element.style.height = '';
+        block.render();
+    }
+    scheduleRender();
+}
+
+function renderTrip(trip, index, tripElement) {
+    const title = document.createElement('h2');
+    title.textContent = `Chapter ${index + 1}: ${trip.title}`;
+
+    const goal = document.createElement('p');
+    const goalLabel = document.createElement('strong');
+    goalLabel.textContent = 'Goal:';
+    goal.append(goalLabel, ` ${trip.goal}`);
+
+    const inventoryTitle = document.createElement('h3');
+    inventoryTitle.textContent = 'Inventory Setup:';
+    const inventoryList = document.createElement('ul');
+    trip.inventory_setup.forEach(item => {
+        const itemElement = document.createElement('li');
+        itemElement.textContent = item;
+        inventoryList.appendChild(itemElement);
+    });
+
+    const stepsTitle = document.createElement('h3');
+    stepsTitle.textContent = 'Steps:';
+    tripElement.append(title, goal, inventoryTitle, inventoryList, stepsTitle);
+
+    for (let start = 0; start < trip.steps.length; start += STEP_BLOCK_SIZE) {
+        const steps = trip.steps.slice(start, start + STEP_BLOCK_SIZE);
+        const stepList = document.createElement('ol');
+        stepList.start = start + 1;
+        tripElement.appendChild(createLazyBlock(stepList, steps.length * ESTIMATED_STEP_HEIGHT, () => renderSteps(steps, stepList)));
+    }
+}
+
+function renderSteps(steps, stepList) {
+    const fragment = document.createDocumentFragment();
+    steps.forEach(step => {
+        const stepElement = document.createElement('li');
+        const checkbox = document.createElement('input');
+        checkbox.type = 'checkbox';
+        // Guides generated before step ids existed can still be viewed, just not saved.
+        if (step.id !== undefined && progress.version !== null) {
+            checkbox.dataset.stepId = step.id;
+            checkbox.checked = isStepDone(step.id);
+        }
+        stepElement.append(checkbox, ` ${step.text}`);
+        fragment.appendChild(stepElement);
+    });
+    stepList.appendChild(fragment);
+}
+
+function onStepToggled(event) {
+    const checkbox = event.target;
+    if (checkbox.type === 'checkbox' && checkbox.dataset.stepId !== undefined) {
+        setStepDone(Number(checkbox.dataset.stepId), checkbox.checked);
+    }
+}
@@ -0,0 +1,19 @@
+import pytest
+
+from scripts import generate_guide
+
+
+@pytest.fixture
+def guide_paths(tmp_path, monkeypatch):
+    """Points the generator at a throwaway database, cache, output and player state."""
+    paths = {
+        "db": tmp_path / "osrs_guide.db",
+        "cache": tmp_path / "guide_cache.db",
+        "output": tmp_path / "hcim_guide.json",
+        "player_state": tmp_path / "player_state.json",
+    }
+    monkeypatch.setattr(generate_guide, "DB_PATH", str(paths["db"]))
+    monkeypatch.setattr(generate_guide, "CACHE_DB_PATH", str(paths["cache"]))
+    monkeypatch.setattr(generate_guide, "OUTPUT_PATH", str(paths["output"]))
+    monkeypatch.setattr(generate_guide, "PLAYER_STATE_PATH", str(paths["player_state"]))
+    return paths
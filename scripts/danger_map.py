@@ -0,0 +1,142 @@
+import sqlite3
+import hashlib
+import math
+import os
+
+# --- DATABASE PATH ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.join(SCRIPT_DIR, '..')
+DB_PATH = os.path.join(PROJECT_ROOT, 'data', 'osrs_guide.db')
+
+# Monsters you can simply walk past only count for part of their max hit
+PASSIVE_THREAT_WEIGHT = 0.5
+# Extra damage assumed from the first poison tick
+POISON_DAMAGE = 4
+
+
+def build_danger_map(conn):
+    """
+    Aggregates every monster spawn into a per-plane, per-region danger grid.
+    The whole grid is computed by SQLite in one grouped query, next to the data,
+    and stored in the region_danger table so the generator never has to touch
+    monsters. The grid is built in a temporary table and only replaces the
+    existing map if the build succeeds and finds at least one spawn.
+    """
+    cursor = conn.cursor()
+    print("Building the region danger map...")
+    try:
+        # An explicit transaction so the CREATE/DROP/RENAME below roll back too
+        cursor.execute("BEGIN;")
+        cursor.execute("DROP TABLE IF EXISTS region_danger_new;")
+        cursor.execute("""
+        CREATE TABLE region_danger_new (
+            plane INTEGER NOT NULL,
+            region_id INTEGER NOT NULL,
+            monster_count INTEGER NOT NULL,
+            max_hit INTEGER NOT NULL,
+            aggressive_max_hit INTEGER NOT NULL,
+            aggressive_combat_level INTEGER NOT NULL,
+            poisonous BOOLEAN NOT NULL,
+            PRIMARY KEY (plane, region_id)
+        );""")
+        # OSRS regions are 64x64 tile squares: region_id = (x >> 6) << 8 | (y >> 6).
+        # Spawns without a plane are on the surface, like in region_key.
+        cursor.execute("""
+            INSERT INTO region_danger_new
+            SELECT
+                COALESCE(s.plane, 0) AS plane,
+                ((s.x >> 6) << 8) | (s.y >> 6) AS region_id,
+                COUNT(*),
+                MAX(COALESCE(m.max_hit, 0)),
+                MAX(CASE WHEN m.is_aggressive THEN COALESCE(m.max_hit, 0) ELSE 0 END),
+                MAX(CASE WHEN m.is_aggressive THEN COALESCE(m.combat_level, 0) ELSE 0 END),
+                MAX(COALESCE(m.is_poisonous, 0))
+            FROM monster_spawns s
+            JOIN monsters m ON m.monster_id = s.monster_id
+            WHERE s.x IS NOT NULL AND s.y IS NOT NULL
+            GROUP BY plane, region_id;
+        """)
+        count = cursor.execute("SELECT COUNT(*) FROM region_danger_new").fetchone()[0]
+        if count == 0:
+            conn.rollback()
+            print("⚠️ No monster spawns found, keeping the existing danger map (if any).")
+            print("Place monster-spawns.json in data/raw and re-run db_loader.py first.")
+            return False
+        cursor.execute("DROP TABLE IF EXISTS region_danger;")
+        cursor.execute("ALTER TABLE region_danger_new RENAME TO region_danger;")
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"❌ Could not build the danger map: {e}")
+        print("Please ensure db_loader.py has been run successfully first.")
+        return False
+    print(f"✅ Danger map built for {count} regions.")
+    return True
+
+
+def region_key(location):
+    """Returns the (plane, region_id) grid key for a location dictionary."""
+    return location.get("plane", 0), ((location["x"] >> 6) << 8) | (location["y"] >> 6)
+
+
+def combat_level(skills):
+    """Calculates the player's combat level using the in-game formula."""
+    base = 0.25 * (skills["defence"] + skills["hitpoints"] + skills["prayer"] // 2)
+    melee = 0.325 * (skills["attack"] + skills["strength"])
+    ranged = 0.325 * (skills["ranged"] * 3 // 2)
+    magic = 0.325 * (skills["magic"] * 3 // 2)
+    return math.floor(base + max(melee, ranged, magic))
+
+
+class DangerMap:
+    """Loads the precomputed region danger grid once for constant-time risk lookups."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.grid = {}
+
+    def load(self):
+        """Reads the region_danger table into memory, if it has been built."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'region_danger'"
+        ).fetchone()
+        if not exists:
+            print("⚠️ No danger map found. Run danger_map.py to enable risk checks.")
+            return self
+        for row in self.conn.execute("SELECT * FROM region_danger ORDER BY plane, region_id"):
+            row = tuple(row)
+            self.grid[(row[0], row[1])] = row[2:]
+        print(f"✅ Loaded danger map for {len(self.grid)} regions.")
+        return self
+
+    def fingerprint(self):
+        """Hashes the loaded grid so plan checkpoints change along with it."""
+        return hashlib.sha1(repr(sorted(self.grid.items())).encode('utf-8')).hexdigest()
+
+    def risk(self, location, player_state):
+        """
+        Estimates how dangerous a location is for the player, as a fraction of
+        their hitpoints that a single hit could take. 0 means no known monsters,
+        1 or more means the player could be killed in one hit.
+        """
+        if not location:
+            return 0.0
+        cell = self.grid.get(region_key(location))
+        if cell is None:
+            return 0.0
+        _, max_hit, aggressive_max_hit, aggressive_combat_level, poisonous = cell
+
+        skills = player_state["skills"]
+        threat = max_hit * PASSIVE_THREAT_WEIGHT
+        # Aggressive monsters ignore players over twice their combat level
+        if aggressive_combat_level * 2 >= combat_level(skills):
+            threat = max(threat, aggressive_max_hit)
+        if poisonous:
+            threat += POISON_DAMAGE
+        return threat / skills["hitpoints"]
+
+
+if __name__ == "__main__":
+    connection = sqlite3.connect(DB_PATH)
+    build_danger_map(connection)
+    connection.close()
@@ -143,6 +143,23 @@ def generate_and_import_map_data():
         
     return True
 
+def check_monster_spawns():
+    """
+    Checks for the optional monster spawn data used by danger_map.py.
+    No download source is wired in for it yet, so the file has to be supplied by hand.
+    """
+    print("\n--- Step 3: Monster Spawn Data (Danger Map) ---")
+    spawns_file = os.path.join(OUTPUT_DIR, 'monster-spawns.json')
+    if os.path.exists(spawns_file):
+        print("✅ 'monster-spawns.json' found. db_loader.py will load it for the danger map.")
+        return True
+    print("⚠️ 'monster-spawns.json' not found. The danger map will stay empty and no quest will be")
+    print("   postponed for being dangerous. To enable it, save a list of")
+    print('   {"id": <monster_id>, "position": {"x": ..., "y": ..., "z": ...}} entries to:')
+    print(f"   {spawns_file}")
+    return False
+
+
 def main():
     """Runs the full data import process."""
     if not os.path.exists(OUTPUT_DIR):
@@ -168,6 +185,8 @@ def main():
             print("\n⚠️ Data import process failed during map generation.")
             return
     
+    check_monster_spawns()
+
     print("\n🎉 Data import process complete. All raw data files are in data/raw/")
 
 
@@ -43,6 +43,18 @@ def create_database(conn):
     );
     """)
 
+    # Monster Spawns Table (one row per spawn point)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS monster_spawns (
+        spawn_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        monster_id INTEGER NOT NULL,
+        x INTEGER,
+        y INTEGER,
+        plane INTEGER,
+        FOREIGN KEY (monster_id) REFERENCES monsters (monster_id)
+    );
+    """)
+
     # Prayers Table
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS prayers (
@@ -120,6 +132,34 @@ def load_monsters(conn):
     print(f"✅ Monsters loaded: {len(monsters_to_insert)} records.")
 
 
+def load_monster_spawns(conn):
+    """Loads monster spawn points from monster-spawns.json into the database, if present."""
+    print("Loading monster spawns...")
+    file_path = os.path.join(DATA_DIR, 'monster-spawns.json')
+    if not os.path.exists(file_path):
+        print("⚠️ monster-spawns.json not found. Skipping spawns, the danger map will be empty.")
+        return
+    with open(file_path, 'r', encoding='utf-8') as f:
+        # A list of {"id": monster_id, "position": {"x", "y", "z"}} entries
+        data = json.load(f)
+
+    cursor = conn.cursor()
+    spawns_to_insert = []
+    for spawn_data in data:
+        pos = spawn_data.get('position') or {}
+        if pos.get('x') is not None and pos.get('y') is not None: # Only insert if there is a position
+            spawns_to_insert.append((
+                spawn_data.get('id'), pos['x'], pos['y'], pos.get('z') or 0
+            ))
+
+    cursor.executemany("""
+        INSERT INTO monster_spawns (monster_id, x, y, plane)
+        VALUES (?, ?, ?, ?);
+    """, spawns_to_insert)
+    conn.commit()
+    print(f"✅ Monster spawns loaded: {len(spawns_to_insert)} records.")
+
+
 def load_prayers(conn):
     """Loads prayer data from prayers-complete.json into the database."""
     print("Loading prayers...")
@@ -186,6 +226,7 @@ if __name__ == "__main__":
     # Load all the data
     load_items(connection)
     load_monsters(connection)
+    load_monster_spawns(connection)
     load_prayers(connection)
     load_locations(connection)
     
@@ -1,20 +1,46 @@
 import sqlite3
 import json
 import os
+import hashlib
+import uuid
+from itertools import takewhile
+
+if __package__:
+    from .danger_map import DangerMap
+    from .task_store import NO_LOCATION, TaskStore
+else:
+    # Running this file directly, e.g. python scripts/generate_guide.py
+    from danger_map import DangerMap
+    from task_store import NO_LOCATION, TaskStore
 
 # --- DATABASE PATH ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.join(SCRIPT_DIR, '..')
 DB_PATH = os.path.join(PROJECT_ROOT, 'data', 'osrs_guide.db')
 OUTPUT_PATH = os.path.join(PROJECT_ROOT, 'output', 'hcim_guide.json')
+# Generator-owned caches live here, outside the tracked source database
+CACHE_DB_PATH = os.path.join(PROJECT_ROOT, 'output', 'guide_cache.db')
+# Optional snapshot of the player's real progress, used as the starting state
+PLAYER_STATE_PATH = os.path.join(PROJECT_ROOT, 'output', 'player_state.json')
+
+# Bump this whenever the planning logic changes so old checkpoints are discarded
+PLANNER_VERSION = 2
+
+# Quests with a step whose location could take this fraction of the player's
+# hitpoints in one hit are postponed as a whole
+MAX_STEP_RISK = 0.5
 
 
 class GuideGenerator:
     def __init__(self):
         """Initializes the Guide Generator, connecting to the database."""
         self.conn = self.get_db_connection()
-        self.player_state = self.initialize_player_state()
+        self.cache_conn = self.get_cache_connection() if self.conn else None
         self.all_tasks = self.load_all_tasks_from_db()
+        self.player_state = self.load_player_state()
+        self.initial_completed_quests = list(self.player_state["completed_quests"])
+        self.danger_map = DangerMap(self.conn).load() if self.conn else DangerMap(None)
+        self.data_version = self.compute_data_version()
         self.guide = []
 
     def get_db_connection(self):
@@ -31,42 +57,144 @@ class GuideGenerator:
             print(f"❌ Database connection error: {e}")
             return None
 
-    def initialize_player_state(self):
+    def get_cache_connection(self):
+        """Opens the generator's cache database, creating it if needed."""
+        conn = sqlite3.connect(CACHE_DB_PATH)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def initialize_player_state():
         """Sets up the initial state for a new level 3 account."""
         return {
             "skills": { "attack": 1, "strength": 1, "defence": 1, "hitpoints": 10, "ranged": 1, "magic": 1, "prayer": 1, "cooking": 1, "woodcutting": 1, "fletching": 1, "fishing": 1, "firemaking": 1, "crafting": 1, "smithing": 1, "mining": 1, "herblore": 1, "agility": 1, "thieving": 1, "slayer": 1, "farming": 1, "runecraft": 1, "hunter": 1, "construction": 1 },
             "completed_quests": [],
+            "completed_tasks": [],
             "inventory": [],
             "bank": [],
             "current_location": {"x": 3222, "y": 3218, "plane": 0}
         }
 
+    def load_player_state(self):
+        """
+        Loads the player's saved progress if a snapshot exists, otherwise starts
+        from a fresh account. Missing keys, including individual skills, fall
+        back to the fresh account values. Ticked steps are given as stable step
+        ids (see assign_step_ids) and translated to the current task ids here.
+        """
+        state = self.initialize_player_state()
+        if not os.path.exists(PLAYER_STATE_PATH):
+            return state
+        with open(PLAYER_STATE_PATH, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        completed_steps = saved.pop("completed_steps", [])
+        step_id_version = saved.pop("step_id_version", None)
+        state["skills"].update(saved.pop("skills", {}))
+        state.update(saved)
+
+        if completed_steps and self.cache_conn:
+            done = set(state["completed_tasks"])
+            done.update(self.resolve_completed_steps(completed_steps, step_id_version))
+            state["completed_tasks"] = sorted(done)
+            # A quest whose steps were all ticked off counts as completed
+            for quest_name in self.all_tasks.quest_ids_by_name:
+                if quest_name not in state["completed_quests"] and self.is_quest_done(quest_name, done):
+                    state["completed_quests"].append(quest_name)
+        print(f"✅ Loaded player progress from {PLAYER_STATE_PATH}")
+        return state
+
+    def resolve_completed_steps(self, step_ids, step_id_version):
+        """Maps stable step ids from player_state.json to the current task ids."""
+        registry_version = self.ensure_step_id_tables()
+        if step_id_version != registry_version:
+            print(f"⚠️ player_state.json uses step id version {step_id_version}, but the registry is "
+                  f"{registry_version}. Ignoring its completed_steps.")
+            return []
+        placeholders = ', '.join('?' * len(step_ids))
+        rows = self.cache_conn.execute(
+            f"SELECT step_key, quest_name FROM guide_step_ids WHERE step_id IN ({placeholders})", list(step_ids)
+        ).fetchall()
+        wanted_keys = {row['step_key'] for row in rows}
+        task_ids = []
+        for quest_name in {row['quest_name'] for row in rows}:
+            if quest_name not in self.all_tasks.quest_ids_by_name:
+                continue
+            task_ids.extend(
+                task_id for task_id, key in self.step_keys_for_quest(quest_name).items() if key in wanted_keys
+            )
+        return task_ids
+
+    def is_quest_done(self, quest_name, completed_tasks):
+        """Returns True when every step of the quest is in completed_tasks."""
+        store = self.all_tasks
+        quest_rows = store.quest_rows[store.quest_ids_by_name[quest_name]]
+        return all(store.task_ids[index] in completed_tasks for index in quest_rows)
+
     def load_all_tasks_from_db(self):
         """
-        Loads all quest steps from the database into a list of task dictionaries.
+        Loads all quest steps and their requirements into a columnar TaskStore.
         """
         print("Loading all tasks from the database...")
-        if not self.conn: return []
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT
-                q.name AS quest_name,
-                t.step_number,
-                t.description
-            FROM tasks t
-            JOIN quests q ON t.quest_id = q.quest_id
-            ORDER BY q.quest_id, t.step_number;
-        """)
-        tasks = [dict(row) for row in cursor.fetchall()]
+        if not self.conn: return TaskStore(None)
+        tasks = TaskStore(self.conn).load()
         print(f"✅ Loaded {len(tasks)} tasks from the database.")
         return tasks
 
+    def compute_data_version(self):
+        """
+        Fingerprints the loaded quest and task data. Checkpoints are stored under
+        this version, so re-running quest_parser.py invalidates them automatically.
+        """
+        if not self.conn: return None
+        digest = hashlib.sha1(str(PLANNER_VERSION).encode('utf-8'))
+        digest.update(self.all_tasks.fingerprint().encode('utf-8'))
+        digest.update(self.danger_map.fingerprint().encode('utf-8'))
+        return digest.hexdigest()
+
+    def hash_player_state(self):
+        """Returns a stable hash of the player state, ignoring list ordering."""
+        state = dict(self.player_state)
+        for key in ("completed_quests", "completed_tasks", "inventory", "bank"):
+            state[key] = sorted(state.get(key, []), key=str)
+        encoded = json.dumps(state, sort_keys=True).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()
+
     def find_unlocked_tasks(self):
         """
-        (Placeholder) Filters tasks based on player_state.
+        (Placeholder) Filters tasks based on player_state and returns the
+        TaskStore row indices that are still available, in quest order.
+        For now this only drops tasks the player has already completed and whole
+        quests that visit a region too dangerous for the player's current stats.
         In the future, this will check skill/quest requirements from the database.
         """
-        return self.all_tasks # For now, we assume all tasks are unlocked
+        store = self.all_tasks
+        completed_quest_ids = {
+            store.quest_ids_by_name[name] for name in self.player_state["completed_quests"]
+            if name in store.quest_ids_by_name
+        }
+        completed_tasks = set(self.player_state["completed_tasks"])
+        task_ids, location_indices = store.task_ids, store.location_indices
+        # Scan the raw columns quest by quest, skipping completed quests by their
+        # row range and taking untouched quests without locations in one go.
+        # Views are only created later for the trip that gets picked.
+        unlocked_rows = []
+        for quest_id, rows in store.quest_rows.items():
+            if quest_id in completed_quest_ids:
+                continue
+            has_locations = quest_id in store.located_quest_ids
+            if not has_locations and completed_tasks.isdisjoint(task_ids[rows.start:rows.stop]):
+                unlocked_rows.extend(rows)
+                continue
+            remaining = [index for index in rows if task_ids[index] not in completed_tasks]
+            # Postpone the whole quest rather than planning around a dangerous step
+            if has_locations and any(
+                location_indices[index] != NO_LOCATION
+                and self.danger_map.risk(store.location(index), self.player_state) >= MAX_STEP_RISK
+                for index in remaining
+            ):
+                continue
+            unlocked_rows.extend(remaining)
+        return unlocked_rows
 
     def create_trip(self):
         """
@@ -74,53 +202,228 @@ class GuideGenerator:
         """
         print("Creating a new trip...")
         
-        unlocked_tasks = self.find_unlocked_tasks()
-        if not unlocked_tasks:
+        unlocked_rows = self.find_unlocked_tasks()
+        if not unlocked_rows:
             print("No more unlocked tasks available.")
             return None
 
-        # Get the name of the first quest in our database
-        first_quest_name = unlocked_tasks[0]['quest_name']
+        # Get the first quest in our database that still has steps left
+        store = self.all_tasks
+        first_quest_id = store.quest_ids[unlocked_rows[0]]
+        first_quest_name = store.quest_names[first_quest_id]
         
-        # Collect all steps for this specific quest
-        quest_steps = [task for task in unlocked_tasks if task['quest_name'] == first_quest_name]
+        # Collect all steps for this specific quest (rows are grouped by quest)
+        quest_steps = [
+            store[index] for index in takewhile(lambda index: store.quest_ids[index] == first_quest_id, unlocked_rows)
+        ]
 
         trip = {
+            "quest": first_quest_name,
             "title": f"Quest: {first_quest_name}",
             "goal": f"Complete {first_quest_name}.",
             "inventory_setup": ["Quest-specific items will go here"],
             "steps": [
                 # Format each step with its number and description from the database
-                {"text": f"Step {s['step_number']}: {s['description']}"} for s in quest_steps
+                {"task_id": s.task_id, "text": f"Step {s.step_number}: {s.description}"}
+                for s in quest_steps
             ]
         }
         return trip
 
+    def apply_trip(self, trip):
+        """
+        Updates the simulated player state as if the trip had been completed.
+        The quest only counts as completed once every one of its steps is done.
+        """
+        completed_tasks = self.player_state["completed_tasks"]
+        completed_tasks.extend(step["task_id"] for step in trip["steps"])
+        if self.is_quest_done(trip["quest"], set(completed_tasks)):
+            self.player_state["completed_quests"].append(trip["quest"])
+
+    def ensure_checkpoint_table(self):
+        """
+        Creates the table that memoizes plans by player state. Each row holds
+        the next trip from a state and the hash of the state that trip leads to,
+        so the remaining plan is rebuilt by following the chain. A row with no
+        trip marks a state where planning finished.
+        """
+        self.cache_conn.execute("""
+        CREATE TABLE IF NOT EXISTS guide_checkpoints (
+            data_version TEXT NOT NULL,
+            state_hash TEXT NOT NULL,
+            trip TEXT,
+            next_state_hash TEXT,
+            PRIMARY KEY (data_version, state_hash)
+        );""")
+        self.cache_conn.commit()
+
+    def load_checkpoint(self, state_hash):
+        """
+        Returns the memoized remaining plan for a player state, or None if the
+        state (or any state along its chain) has not been checkpointed.
+        """
+        plan = []
+        seen = set()
+        while state_hash not in seen:
+            seen.add(state_hash)
+            row = self.cache_conn.execute(
+                "SELECT trip, next_state_hash FROM guide_checkpoints WHERE data_version = ? AND state_hash = ?",
+                (self.data_version, state_hash)
+            ).fetchone()
+            if row is None:
+                return None
+            if row['trip'] is None:
+                return plan
+            plan.append(json.loads(row['trip']))
+            state_hash = row['next_state_hash']
+        return None
+
+    def save_checkpoints(self, checkpoints):
+        """
+        Stores one (state, next trip, next state) row for every state planned
+        during this run and drops checkpoints built from older quest/task data.
+        """
+        cursor = self.cache_conn.cursor()
+        cursor.execute("DELETE FROM guide_checkpoints WHERE data_version != ?", (self.data_version,))
+        cursor.executemany("""
+            INSERT OR REPLACE INTO guide_checkpoints (data_version, state_hash, trip, next_state_hash)
+            VALUES (?, ?, ?, ?);
+        """, [
+            (self.data_version, state_hash, json.dumps(trip) if trip else None, next_state_hash)
+            for state_hash, trip, next_state_hash in checkpoints
+        ])
+        self.cache_conn.commit()
+        print(f"✅ Saved {len(checkpoints)} plan checkpoints.")
+
     def run(self):
-        """Generates the full guide."""
+        """
+        Generates the full guide from the current player state. Each state along
+        the way is checkpointed, so a later run that reaches a known state reuses
+        the memoized remainder of the plan instead of planning it again.
+        """
         print("\nStarting guide generation...")
         if not self.all_tasks:
             print("No tasks loaded from the database. Cannot generate a guide.")
             return
 
-        # For now, just generate one trip for the first quest to prove it works
-        new_trip = self.create_trip()
-        if new_trip:
+        self.ensure_checkpoint_table()
+        checkpoints = []
+        state_hash = self.hash_player_state()
+        while True:
+            cached_plan = self.load_checkpoint(state_hash)
+            if cached_plan is not None:
+                print(f"♻️ Reusing {len(cached_plan)} memoized trips from checkpoint {state_hash[:8]}.")
+                self.guide.extend(cached_plan)
+                break
+
+            new_trip = self.create_trip()
+            if not new_trip:
+                checkpoints.append((state_hash, None, None))
+                break
             self.guide.append(new_trip)
             # Mark the quest as "completed" in our simulation
-            self.player_state["completed_quests"].append(new_trip["title"])
+            self.apply_trip(new_trip)
+            next_state_hash = self.hash_player_state()
+            checkpoints.append((state_hash, new_trip, next_state_hash))
+            state_hash = next_state_hash
+
+        if checkpoints:
+            self.save_checkpoints(checkpoints)
+        self.report_unplanned_quests()
 
         print("Guide generation complete.")
         self.save_guide()
 
+    def report_unplanned_quests(self):
+        """Warns about quests that were postponed as too dangerous and left out of the guide."""
+        planned = set(self.initial_completed_quests) | {trip["quest"] for trip in self.guide}
+        unplanned = [name for name in self.all_tasks.quest_ids_by_name if name not in planned]
+        if unplanned:
+            print(f"⚠️ {len(unplanned)} quests were too dangerous for the planned stats and are NOT in this guide:")
+            for name in unplanned:
+                print(f"   - {name}")
+
+    def ensure_step_id_tables(self):
+        """
+        Creates the step id registry in the cache database and returns its
+        version. The version is a random token made when the registry is first
+        created, so the viewer can tell when ids were issued by a different
+        registry (for example after the cache was deleted).
+        """
+        cursor = self.cache_conn.cursor()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS guide_step_ids (
+            step_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            step_key TEXT NOT NULL UNIQUE,
+            quest_name TEXT NOT NULL
+        );""")
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS guide_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );""")
+        cursor.execute(
+            "INSERT OR IGNORE INTO guide_meta (key, value) VALUES ('step_id_version', ?)", (uuid.uuid4().hex,)
+        )
+        self.cache_conn.commit()
+        return cursor.execute("SELECT value FROM guide_meta WHERE key = 'step_id_version'").fetchone()[0]
+
+    def step_keys_for_quest(self, quest_name):
+        """
+        Returns {task_id: step_key} for every step of a quest. A key hashes the
+        quest name, the step text and how many identical steps came before it,
+        so it does not depend on task ids or on steps inserted elsewhere.
+        """
+        store = self.all_tasks
+        keys = {}
+        seen = {}
+        for index in store.quest_rows[store.quest_ids_by_name[quest_name]]:
+            description = store.description(index)
+            occurrence = seen.get(description, 0)
+            seen[description] = occurrence + 1
+            digest = hashlib.sha1()
+            for part in (quest_name, description, str(occurrence)):
+                data = part.encode('utf-8')
+                digest.update(len(data).to_bytes(8, 'little'))
+                digest.update(data)
+            keys[store.task_ids[index]] = digest.hexdigest()
+        return keys
+
+    def assign_step_ids(self):
+        """
+        Gives every step a small integer id that stays the same across
+        regenerations, DB rebuilds and quest re-parses. Ids are keyed on step
+        content and kept in the cache database, which db_loader.py never
+        deletes. The web viewer uses them as bit positions in its saved
+        progress bitmap. Returns the registry version.
+        """
+        version = self.ensure_step_id_tables()
+        keyed_steps = []
+        for trip in self.guide:
+            quest_keys = self.step_keys_for_quest(trip["quest"])
+            keyed_steps.extend((step, quest_keys[step["task_id"]], trip["quest"]) for step in trip["steps"])
+        cursor = self.cache_conn.cursor()
+        cursor.executemany(
+            "INSERT OR IGNORE INTO guide_step_ids (step_key, quest_name) VALUES (?, ?)",
+            [(key, quest_name) for _, key, quest_name in keyed_steps]
+        )
+        self.cache_conn.commit()
+        step_ids = {row[0]: row[1] for row in cursor.execute("SELECT step_key, step_id FROM guide_step_ids")}
+        for step, key, _ in keyed_steps:
+            step["id"] = step_ids[key]
+        return version
+
     def save_guide(self):
-        """Saves the generated guide to a JSON file."""
+        """Saves the generated guide, with its step id version, to a JSON file."""
+        step_id_version = self.assign_step_ids()
         with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-            json.dump(self.guide, f, indent=4)
+            json.dump({"step_id_version": step_id_version, "trips": self.guide}, f, indent=4)
         print(f"✅ Guide saved to {OUTPUT_PATH}")
 
     def close(self):
-        """Closes the database connection."""
+        """Closes the database connections."""
+        if self.cache_conn:
+            self.cache_conn.close()
         if self.conn:
             self.conn.close()
             print("Database connection closed.")
@@ -0,0 +1,50 @@
+import sqlite3
+
+from scripts import generate_guide
+
+# A small two-quest walkthrough shared by the generator and task store tests
+QUESTS = {
+    "Cook's Assistant": ["Talk to the Cook.", "Bring the ingredients."],
+    "The Restless Ghost": ["Talk to Father Aereck.", "Find the skull."],
+}
+
+
+def create_guide_db(path, quests, requirements=()):
+    """
+    Creates a small guide database with the same quest/task schema as the real one.
+    quests maps quest names to their step descriptions, in order. requirements is a
+    list of (task_id, type, name, quantity) rows.
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+    CREATE TABLE quests (
+        quest_id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, wiki_url TEXT
+    );
+    CREATE TABLE tasks (
+        task_id INTEGER PRIMARY KEY AUTOINCREMENT, quest_id INTEGER, step_number INTEGER,
+        description TEXT NOT NULL
+    );
+    CREATE TABLE task_requirements (
+        requirement_id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER NOT NULL,
+        type TEXT NOT NULL, name TEXT NOT NULL, quantity INTEGER NOT NULL
+    );
+    """)
+    for quest_id, (quest_name, steps) in enumerate(quests.items(), start=1):
+        conn.execute("INSERT INTO quests (quest_id, name) VALUES (?, ?)", (quest_id, quest_name))
+        conn.executemany(
+            "INSERT INTO tasks (quest_id, step_number, description) VALUES (?, ?, ?)",
+            [(quest_id, number, text) for number, text in enumerate(steps, start=1)]
+        )
+    conn.executemany(
+        "INSERT INTO task_requirements (task_id, type, name, quantity) VALUES (?, ?, ?, ?)", requirements
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_generator():
+    """Runs one full generation and returns the finished generator."""
+    generator = generate_guide.GuideGenerator()
+    generator.run()
+    generator.close()
+    return generator
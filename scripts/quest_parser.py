@@ -32,6 +32,12 @@ def create_quest_tables(conn):
         description TEXT NOT NULL,
         FOREIGN KEY (quest_id) REFERENCES quests (quest_id)
     );""")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS task_requirements (
+        requirement_id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER NOT NULL,
+        type TEXT NOT NULL, name TEXT NOT NULL, quantity INTEGER NOT NULL,
+        FOREIGN KEY (task_id) REFERENCES tasks (task_id)
+    );""")
     conn.commit()
     print("✅ Tables are ready.")
 
@@ -132,9 +138,10 @@ if __name__ == "__main__":
         
         print("\nClearing all existing quest and task data from the database...")
         cur = connection.cursor()
+        cur.execute("DELETE FROM task_requirements;")
         cur.execute("DELETE FROM tasks;")
         cur.execute("DELETE FROM quests;")
-        cur.execute("DELETE FROM sqlite_sequence WHERE name IN ('tasks', 'quests');")
+        cur.execute("DELETE FROM sqlite_sequence WHERE name IN ('task_requirements', 'tasks', 'quests');")
         connection.commit()
         print("✅ Existing data cleared.")
         
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
-@dataclass
+@dataclass(slots=True)
 class Requirement:
     """Represents a single requirement for a task."""
     # e.g., 'skill', 'quest', 'item'
@@ -11,7 +11,7 @@ class Requirement:
     # e.g., 5 (for level), 1 (for quest completion), 1 (for item quantity)
     quantity: int
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """Represents a single, atomic action in the game."""
     task_id: int
@@ -0,0 +1,243 @@
+import sqlite3
+import hashlib
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+if __package__:
+    from .task import Requirement, Task
+else:
+    # Running a file under scripts/ directly, e.g. python scripts/generate_guide.py
+    from task import Requirement, Task
+
+# Tasks without a known location point at this index
+NO_LOCATION = -1
+
+# Every row in the tasks table is currently a quest walkthrough step
+QUEST_STEP = 'QUEST_STEP'
+
+
+class TaskView:
+    """
+    A lightweight, read-only view of one task inside a TaskStore.
+    Exposes the same fields as the Task model without copying the row.
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: 'TaskStore', index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def task_id(self) -> int:
+        return self._store.task_ids[self._index]
+
+    @property
+    def quest_id(self) -> int:
+        return self._store.quest_ids[self._index]
+
+    @property
+    def step_number(self) -> int:
+        return self._store.step_numbers[self._index]
+
+    @property
+    def task_type(self) -> str:
+        return self._store.task_type_names[self._store.task_types[self._index]]
+
+    @property
+    def parent_activity(self) -> Optional[str]:
+        return self._store.quest_names.get(self.quest_id)
+
+    @property
+    def name(self) -> str:
+        return f"{self.parent_activity}: Step {self.step_number}"
+
+    @property
+    def description(self) -> str:
+        return self._store.description(self._index)
+
+    @property
+    def requirements(self) -> List[Requirement]:
+        return self._store.requirements(self._index)
+
+    @property
+    def location(self) -> Dict[str, int]:
+        return self._store.location(self._index)
+
+    def to_task(self) -> Task:
+        """Materializes this view into a full Task object."""
+        return Task(
+            task_id=self.task_id,
+            name=self.name,
+            task_type=self.task_type,
+            requirements=self.requirements,
+            location=self.location,
+            parent_activity=self.parent_activity
+        )
+
+    def __repr__(self):
+        return f"TaskView(task_id={self.task_id}, name={self.name!r})"
+
+
+class TaskStore:
+    """
+    Holds every task and its requirements in flat, columnar arrays.
+    Strings are interned and descriptions are only read from the database
+    when they are first needed, one quest at a time.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.task_ids = array('l')
+        self.quest_ids = array('l')
+        self.step_numbers = array('l')
+        self.task_types = array('B')
+        self.location_indices = array('l')
+        self.task_type_names: List[str] = []
+        self.quest_names: Dict[int, str] = {}
+        self.quest_ids_by_name: Dict[str, int] = {}
+        # Rows are sorted by quest, so each quest's tasks form one contiguous range
+        self.quest_rows: Dict[int, range] = {}
+        # Quests with at least one task that has a location
+        self.located_quest_ids = set()
+
+        # Requirements use a CSR layout: the requirements of task i live in
+        # the slice req_offsets[i]:req_offsets[i + 1] of the req_* columns.
+        self.req_offsets = array('l', [0])
+        self.req_types = array('B')
+        self.req_names: List[str] = []
+        self.req_quantities = array('l')
+        self.req_type_names: List[str] = []
+
+        self._index_by_task_id: Dict[int, int] = {}
+        self._descriptions: Dict[int, str] = {}
+        self._locations: Dict[int, Dict[str, int]] = {}
+
+    def load(self) -> 'TaskStore':
+        """Loads all tasks and their requirements with a single query."""
+        cursor = self.conn.execute("""
+            SELECT
+                t.task_id,
+                q.quest_id,
+                q.name,
+                t.step_number,
+                r.type,
+                r.name,
+                r.quantity
+            FROM tasks t
+            JOIN quests q ON t.quest_id = q.quest_id
+            LEFT JOIN task_requirements r ON r.task_id = t.task_id
+            ORDER BY q.quest_id, t.step_number, t.task_id, r.requirement_id;
+        """)
+        task_type_codes = {}
+        req_type_codes = {}
+        quest_step_code = self._intern_code(QUEST_STEP, task_type_codes, self.task_type_names)
+        last_task_id = None
+
+        for task_id, quest_id, quest_name, step_number, req_type, req_name, req_quantity in cursor:
+            if task_id != last_task_id:
+                if last_task_id is not None:
+                    self.req_offsets.append(len(self.req_types))
+                last_task_id = task_id
+                self._index_by_task_id[task_id] = len(self.task_ids)
+                self.task_ids.append(task_id)
+                self.quest_ids.append(quest_id)
+                self.step_numbers.append(step_number)
+                self.task_types.append(quest_step_code)
+                self.location_indices.append(NO_LOCATION)
+                if quest_id not in self.quest_names:
+                    self.quest_names[quest_id] = sys.intern(quest_name)
+                    self.quest_ids_by_name[self.quest_names[quest_id]] = quest_id
+                    self.quest_rows[quest_id] = range(len(self.task_ids) - 1, len(self.task_ids))
+                else:
+                    self.quest_rows[quest_id] = range(self.quest_rows[quest_id].start, len(self.task_ids))
+
+            if req_type is not None:
+                self.req_types.append(self._intern_code(req_type, req_type_codes, self.req_type_names))
+                self.req_names.append(sys.intern(req_name))
+                self.req_quantities.append(req_quantity)
+
+        if last_task_id is not None:
+            self.req_offsets.append(len(self.req_types))
+        return self
+
+    @staticmethod
+    def _intern_code(value: str, codes: Dict[str, int], names: List[str]) -> int:
+        """Returns the small integer code for a repeated string, assigning one if new."""
+        if value not in codes:
+            codes[value] = len(names)
+            names.append(sys.intern(value))
+        return codes[value]
+
+    def __len__(self) -> int:
+        return len(self.task_ids)
+
+    def __iter__(self) -> Iterator[TaskView]:
+        for index in range(len(self.task_ids)):
+            yield TaskView(self, index)
+
+    def __getitem__(self, index: int) -> TaskView:
+        if not 0 <= index < len(self.task_ids):
+            raise IndexError(index)
+        return TaskView(self, index)
+
+    def get(self, task_id: int) -> Optional[TaskView]:
+        """Returns the view for a task id, or None if it is not loaded."""
+        index = self._index_by_task_id.get(task_id)
+        return TaskView(self, index) if index is not None else None
+
+    def description(self, index: int) -> str:
+        """Returns a task's description, fetching its whole quest on first use."""
+        task_id = self.task_ids[index]
+        if task_id not in self._descriptions:
+            rows = self.conn.execute(
+                "SELECT task_id, description FROM tasks WHERE quest_id = ?",
+                (self.quest_ids[index],)
+            )
+            self._descriptions.update((row[0], row[1]) for row in rows)
+        return self._descriptions[task_id]
+
+    def requirements(self, index: int) -> List[Requirement]:
+        """Builds Requirement objects for a task from the requirement columns."""
+        start, end = self.req_offsets[index], self.req_offsets[index + 1]
+        return [
+            Requirement(self.req_type_names[self.req_types[i]], self.req_names[i], self.req_quantities[i])
+            for i in range(start, end)
+        ]
+
+    def location(self, index: int) -> Dict[str, int]:
+        """Returns a task's coordinates, or an empty dict if it has no location."""
+        location_id = self.location_indices[index]
+        if location_id == NO_LOCATION:
+            return {}
+        if location_id not in self._locations:
+            row = self.conn.execute(
+                "SELECT x, y, plane FROM locations WHERE location_id = ?", (location_id,)
+            ).fetchone()
+            self._locations[location_id] = {"x": row[0], "y": row[1], "plane": row[2]} if row else {}
+        return self._locations[location_id]
+
+    def fingerprint(self) -> str:
+        """
+        Hashes the quest, task and requirement data. Every field is length-prefixed
+        so text moving between fields still changes the hash. Descriptions are
+        streamed straight from the database so they are not kept in memory.
+        """
+        digest = hashlib.sha1()
+
+        def add(data: bytes):
+            digest.update(len(data).to_bytes(8, 'little'))
+            digest.update(data)
+
+        for column in (self.task_ids, self.quest_ids, self.step_numbers, self.req_offsets,
+                       self.req_types, self.req_quantities):
+            add(column.tobytes())
+        for name in self.req_type_names + self.req_names:
+            add(name.encode('utf-8'))
+        for quest_id, quest_name in sorted(self.quest_names.items()):
+            add(str(quest_id).encode('utf-8'))
+            add(quest_name.encode('utf-8'))
+        for task_id, description in self.conn.execute("SELECT task_id, description FROM tasks ORDER BY task_id"):
+            add(str(task_id).encode('utf-8'))
+            add(description.encode('utf-8'))
+        return digest.hexdigest()
@@ -0,0 +1,137 @@
+import sqlite3
+
+import pytest
+
+from scripts import generate_guide
+from scripts.guide_test_utils import create_guide_db
+from scripts.danger_map import DangerMap, build_danger_map, combat_level, region_key
+
+LUMBRIDGE = {"x": 3222, "y": 3218, "plane": 0}
+VARROCK = {"x": 3212, "y": 3428, "plane": 0}
+
+
+def add_monsters(conn, monsters, spawns):
+    """monsters: (monster_id, combat_level, max_hit, is_aggressive, is_poisonous); spawns: (monster_id, location)"""
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS monsters (
+        monster_id INTEGER PRIMARY KEY, name TEXT NOT NULL, combat_level INTEGER, hitpoints INTEGER,
+        is_aggressive BOOLEAN, is_poisonous BOOLEAN, attack_type TEXT, max_hit INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS monster_spawns (
+        spawn_id INTEGER PRIMARY KEY AUTOINCREMENT, monster_id INTEGER NOT NULL, x INTEGER, y INTEGER, plane INTEGER
+    );
+    """)
+    conn.executemany(
+        "INSERT INTO monsters (monster_id, name, combat_level, is_aggressive, is_poisonous, max_hit) VALUES (?, 'Monster', ?, ?, ?, ?)",
+        [(monster_id, level, aggressive, poisonous, max_hit) for monster_id, level, max_hit, aggressive, poisonous in monsters]
+    )
+    conn.executemany(
+        "INSERT INTO monster_spawns (monster_id, x, y, plane) VALUES (?, ?, ?, ?)",
+        [(monster_id, loc["x"], loc["y"], loc["plane"]) for monster_id, loc in spawns]
+    )
+    conn.commit()
+
+
+def player(attack_and_strength=2, hitpoints=10):
+    state = generate_guide.GuideGenerator.initialize_player_state()
+    state["skills"]["attack"] = attack_and_strength // 2
+    state["skills"]["strength"] = attack_and_strength - attack_and_strength // 2
+    state["skills"]["hitpoints"] = hitpoints
+    return state
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+
+def test_combat_level_uses_the_in_game_formula():
+    assert combat_level(player()["skills"]) == 3
+    assert combat_level(player(attack_and_strength=54)["skills"]) == 20
+    assert combat_level(player(attack_and_strength=57)["skills"]) == 21
+
+
+def test_aggressive_monsters_only_count_up_to_twice_their_level(conn):
+    # A level 10 aggressive monster hitting 6 ignores players above combat level 20
+    add_monsters(conn, [(1, 10, 6, 1, 0)], [(1, LUMBRIDGE)])
+    build_danger_map(conn)
+    danger = DangerMap(conn).load()
+
+    assert danger.risk(LUMBRIDGE, player()) == pytest.approx(0.6)
+    assert danger.risk(LUMBRIDGE, player(attack_and_strength=54)) == pytest.approx(0.6)
+    # Above the threshold only the passive share of its max hit is left
+    assert danger.risk(LUMBRIDGE, player(attack_and_strength=57)) == pytest.approx(0.3)
+
+
+def test_risk_scales_with_hitpoints_and_adds_poison(conn):
+    add_monsters(conn, [(1, 50, 10, 0, 1)], [(1, LUMBRIDGE)])
+    build_danger_map(conn)
+    danger = DangerMap(conn).load()
+
+    assert danger.risk(LUMBRIDGE, player(hitpoints=10)) == pytest.approx((10 * 0.5 + 4) / 10)
+    assert danger.risk(LUMBRIDGE, player(hitpoints=90)) == pytest.approx((10 * 0.5 + 4) / 90)
+
+
+def test_unknown_regions_and_missing_locations_have_no_risk(conn):
+    add_monsters(conn, [(1, 10, 6, 1, 0)], [(1, LUMBRIDGE)])
+    build_danger_map(conn)
+    danger = DangerMap(conn).load()
+
+    assert danger.risk(VARROCK, player()) == 0.0
+    assert danger.risk({}, player()) == 0.0
+
+
+def test_failed_or_empty_builds_keep_the_existing_map(conn):
+    assert build_danger_map(conn) is False
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name LIKE 'region_danger%'").fetchall() == []
+
+    add_monsters(conn, [(1, 10, 6, 1, 0)], [(1, LUMBRIDGE)])
+    assert build_danger_map(conn) is True
+    conn.execute("DELETE FROM monster_spawns")
+    conn.commit()
+
+    assert build_danger_map(conn) is False
+    assert len(DangerMap(conn).load().grid) == 1
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name LIKE 'region_danger%'").fetchall() == [("region_danger",)]
+
+
+def test_spawns_without_a_plane_are_on_the_surface(conn):
+    add_monsters(conn, [(1, 10, 6, 1, 0)], [
+        (1, dict(LUMBRIDGE, plane=None)),
+        (1, {"x": None, "y": None, "plane": 0}),
+    ])
+
+    assert build_danger_map(conn) is True
+    assert not conn.in_transaction
+    danger = DangerMap(conn).load()
+    # Only the spawn with coordinates is counted
+    assert list(danger.grid) == [region_key(LUMBRIDGE)]
+    assert danger.grid[region_key(LUMBRIDGE)][0] == 1
+
+
+def test_quest_with_one_dangerous_step_is_postponed_whole(guide_paths):
+    create_guide_db(guide_paths["db"], {
+        "Safe Quest": ["Talk to Hans."],
+        "Risky Quest": ["Talk to the Duke.", "Walk past the monster."],
+    })
+    conn = sqlite3.connect(guide_paths["db"])
+    add_monsters(conn, [(1, 10, 6, 1, 0)], [(1, LUMBRIDGE)])
+    conn.execute("CREATE TABLE locations (location_id INTEGER PRIMARY KEY, name TEXT, region_id INTEGER, x INTEGER, y INTEGER, plane INTEGER)")
+    conn.execute("INSERT INTO locations VALUES (1, 'Lumbridge', NULL, ?, ?, ?)", (LUMBRIDGE["x"], LUMBRIDGE["y"], LUMBRIDGE["plane"]))
+    conn.commit()
+    build_danger_map(conn)
+    conn.close()
+
+    generator = generate_guide.GuideGenerator()
+    # Tasks do not carry locations yet, so place the risky step by hand
+    store = generator.all_tasks
+    risky_row = store.quest_rows[store.quest_ids_by_name["Risky Quest"]][1]
+    store.location_indices[risky_row] = 1
+    store.located_quest_ids.add(store.quest_ids[risky_row])
+    generator.run()
+    generator.close()
+
+    assert [trip["quest"] for trip in generator.guide] == ["Safe Quest"]
+    assert generator.player_state["completed_quests"] == ["Safe Quest"]
@@ -0,0 +1,99 @@
+import json
+import sqlite3
+
+from scripts import generate_guide
+from scripts.guide_test_utils import QUESTS, create_guide_db, run_generator
+
+
+def checkpoint_rows(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT data_version, trip FROM guide_checkpoints").fetchall()
+    conn.close()
+    return rows
+
+
+def test_first_run_plans_every_quest_and_checkpoints_each_state(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+
+    generator = run_generator()
+
+    assert [trip["quest"] for trip in generator.guide] == list(QUESTS)
+    rows = checkpoint_rows(guide_paths["cache"])
+    # One row per planned trip plus the finished state, each holding a single trip
+    assert len(rows) == len(QUESTS) + 1
+    assert sorted(json.loads(trip)["quest"] for _, trip in rows if trip) == sorted(QUESTS)
+
+
+def test_rerun_reuses_checkpoints_without_planning(guide_paths, monkeypatch):
+    create_guide_db(guide_paths["db"], QUESTS)
+    first = run_generator()
+
+    def fail(self):
+        raise AssertionError("create_trip should not run on a checkpoint hit")
+    monkeypatch.setattr(generate_guide.GuideGenerator, "create_trip", fail)
+    second = run_generator()
+
+    assert second.guide == first.guide
+
+
+def test_changed_task_data_invalidates_checkpoints(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+    first = run_generator()
+
+    conn = sqlite3.connect(guide_paths["db"])
+    conn.execute("UPDATE tasks SET description = 'Find the skull in the swamp.' WHERE description = 'Find the skull.'")
+    conn.commit()
+    conn.close()
+    second = run_generator()
+
+    assert second.data_version != first.data_version
+    assert "Find the skull in the swamp." in json.dumps(second.guide)
+    assert {version for version, _ in checkpoint_rows(guide_paths["cache"])} == {second.data_version}
+
+
+def test_generation_does_not_modify_the_source_database(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+    before = guide_paths["db"].read_bytes()
+
+    run_generator()
+
+    assert guide_paths["db"].read_bytes() == before
+
+
+def test_partial_skills_are_merged_into_the_fresh_account(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+    guide_paths["player_state"].write_text(json.dumps({"skills": {"attack": 40}}))
+
+    generator = generate_guide.GuideGenerator()
+    generator.close()
+
+    assert generator.player_state["skills"]["attack"] == 40
+    assert generator.player_state["skills"]["hitpoints"] == 10
+
+
+def test_resumes_from_ticked_step_ids(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+    run_generator()
+    guide = json.loads(guide_paths["output"].read_text())
+    ghost_steps = guide["trips"][1]["steps"]
+    guide_paths["player_state"].write_text(json.dumps({
+        "step_id_version": guide["step_id_version"],
+        "completed_steps": [step["id"] for step in guide["trips"][0]["steps"]] + [ghost_steps[0]["id"]],
+    }))
+
+    generator = run_generator()
+
+    assert generator.player_state["completed_quests"] == ["Cook's Assistant", "The Restless Ghost"]
+    assert [trip["quest"] for trip in generator.guide] == ["The Restless Ghost"]
+    assert [step["id"] for step in generator.guide[0]["steps"]] == [step["id"] for step in ghost_steps[1:]]
+
+
+def test_ticked_step_ids_from_another_registry_are_ignored(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+    run_generator()
+    guide_paths["player_state"].write_text(json.dumps({"step_id_version": "other", "completed_steps": [1, 2]}))
+
+    generator = generate_guide.GuideGenerator()
+    generator.close()
+
+    assert generator.player_state["completed_tasks"] == []
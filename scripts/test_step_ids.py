@@ -0,0 +1,78 @@
+import json
+import sqlite3
+
+from scripts.guide_test_utils import QUESTS, create_guide_db, run_generator
+
+
+def step_ids_by_text(guide_paths):
+    guide = json.loads(guide_paths["output"].read_text())
+    ids = {}
+    for trip in guide["trips"]:
+        for step in trip["steps"]:
+            # Drop the "Step N: " prefix, which changes when steps are renumbered
+            ids[(trip["quest"], step["text"].split(": ", 1)[1])] = step["id"]
+    return guide["step_id_version"], ids
+
+
+def test_ids_are_stable_across_regenerations(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+    run_generator()
+    first = step_ids_by_text(guide_paths)
+
+    guide_paths["output"].unlink()
+    run_generator()
+
+    assert step_ids_by_text(guide_paths) == first
+    assert sorted(first[1].values()) == [1, 2, 3, 4]
+
+
+def test_ids_survive_a_database_rebuild_and_an_inserted_step(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+    run_generator()
+    version, ids = step_ids_by_text(guide_paths)
+
+    # Rebuild the source DB from scratch, as db_loader.py and quest_parser.py do,
+    # with a new first step that shifts every step number and task id
+    guide_paths["db"].unlink()
+    create_guide_db(guide_paths["db"], {
+        "Cook's Assistant": ["Read the cookbook.", "Talk to the Cook.", "Bring the ingredients."],
+        "The Restless Ghost": QUESTS["The Restless Ghost"],
+    })
+    run_generator()
+    new_version, new_ids = step_ids_by_text(guide_paths)
+
+    assert new_version == version
+    for key, step_id in ids.items():
+        assert new_ids[key] == step_id
+    assert new_ids[("Cook's Assistant", "Read the cookbook.")] == 5
+
+
+def test_identical_steps_in_one_quest_get_distinct_ids(guide_paths):
+    create_guide_db(guide_paths["db"], {"Imp Catcher": ["Kill an imp.", "Kill an imp.", "Talk to Mizgog."]})
+    run_generator()
+
+    guide = json.loads(guide_paths["output"].read_text())
+
+    assert [step["id"] for step in guide["trips"][0]["steps"]] == [1, 2, 3]
+
+
+def test_a_new_registry_gets_a_new_version(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+    run_generator()
+    version, _ = step_ids_by_text(guide_paths)
+
+    guide_paths["cache"].unlink()
+    run_generator()
+
+    assert step_ids_by_text(guide_paths)[0] != version
+
+
+def test_ids_are_not_stored_in_the_source_database(guide_paths):
+    create_guide_db(guide_paths["db"], QUESTS)
+    run_generator()
+
+    conn = sqlite3.connect(guide_paths["db"])
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+
+    assert "guide_step_ids" not in tables
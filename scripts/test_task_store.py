@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+
+from scripts.guide_test_utils import QUESTS, create_guide_db
+from scripts.task import Requirement, Task
+from scripts.task_store import QUEST_STEP, TaskStore
+
+REQUIREMENTS = [
+    (2, "item", "Egg", 1),
+    (2, "item", "Bucket of milk", 1),
+    (4, "skill", "prayer", 1),
+]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    path = tmp_path / "osrs_guide.db"
+    create_guide_db(path, QUESTS, REQUIREMENTS)
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+def test_requirements_are_sliced_per_task(conn):
+    store = TaskStore(conn).load()
+
+    assert [task.requirements for task in store] == [
+        [],
+        [Requirement("item", "Egg", 1), Requirement("item", "Bucket of milk", 1)],
+        [],
+        [Requirement("skill", "prayer", 1)],
+    ]
+    assert list(store.req_offsets) == [0, 0, 2, 2, 3]
+
+
+def test_views_match_the_task_model(conn):
+    store = TaskStore(conn).load()
+
+    view = store.get(4)
+
+    assert (view.task_id, view.quest_id, view.step_number) == (4, 2, 2)
+    assert view.task_type == QUEST_STEP
+    assert view.to_task() == Task(
+        task_id=4,
+        name="The Restless Ghost: Step 2",
+        task_type=QUEST_STEP,
+        requirements=[Requirement("skill", "prayer", 1)],
+        location={},
+        parent_activity="The Restless Ghost",
+    )
+    assert not hasattr(view, "__dict__")
+    assert store.quest_rows == {1: range(0, 2), 2: range(2, 4)}
+
+
+def test_descriptions_are_loaded_lazily_one_quest_at_a_time(conn):
+    store = TaskStore(conn).load()
+    queries = []
+    conn.set_trace_callback(queries.append)
+
+    assert store.get(3).description == "Talk to Father Aereck."
+    assert store.get(4).description == "Find the skull."
+    assert len(queries) == 1
+    assert set(store._descriptions) == {3, 4}
+
+
+def test_fingerprint_changes_when_text_moves_between_fields(conn):
+    before = TaskStore(conn).load().fingerprint()
+
+    # Unseparated, "item" "skill" "Egg" and "item" "skil" "lEgg" hash the same bytes
+    conn.execute("UPDATE task_requirements SET type = 'skil' WHERE type = 'skill'")
+    conn.execute("UPDATE task_requirements SET name = 'lEgg' WHERE name = 'Egg'")
+    conn.commit()
+
+    assert TaskStore(conn).load().fingerprint() != before